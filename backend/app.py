@@ -2,12 +2,16 @@
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import joblib
 import numpy as np
 import os
 import subprocess
 import traceback
 import logging
+import time
+import uuid
+from datetime import datetime
+from model_registry import ModelRegistry, load_registry
+from audit_log import AuditLog
 
 # Set up logging
 logging.basicConfig(level=logging.INFO,
@@ -26,22 +30,42 @@ MODEL_DIRECTORY = os.path.join(current_dir, "models")
 MODEL_PATH = os.path.join(MODEL_DIRECTORY, "model.pkl")
 SCALER_PATH = os.path.join(MODEL_DIRECTORY, "scaler.pkl")
 IMPUTER_PATH = os.path.join(MODEL_DIRECTORY, "imputer.pkl")
+REGISTRY_CONFIG_PATH = os.environ.get("MODEL_REGISTRY_PATH", os.path.join(MODEL_DIRECTORY, "registry.json"))
+AUDIT_DB_PATH = os.environ.get("AUDIT_DB_PATH", os.path.join(current_dir, "audit", "predictions.db"))
+
+# Features in the order expected by the model
+EXPECTED_FEATURES = [
+    'age', 'bmi', 'heart_rate', 'respiratory_rate', 'mean_arterial_pressure',
+    'temperature', 'gcs_eyes', 'gcs_motor', 'gcs_verbal', 'creatinine',
+    'blood_urea_nitrogen', 'sodium', 'albumin', 'wbcs', 'hematocrit',
+    'pao2', 'blood_ph', 'aids', 'cirrhosis', 'diabetes',
+    'hepatic_failure', 'immunosuppression'
+]
 
 logger.info(f"Looking for model at: {MODEL_PATH}")
 logger.info(f"Looking for scaler at: {SCALER_PATH}")
 logger.info(f"Looking for imputer at: {IMPUTER_PATH}")
+logger.info(f"Looking for model registry config at: {REGISTRY_CONFIG_PATH}")
 
 # Ensure models directory exists
 os.makedirs(MODEL_DIRECTORY, exist_ok=True)
 
-# Initialize model, scaler, and imputer
-model = None
-scaler = None
-imputer = None
+# Loaded models; replaced as a whole on reload so requests never see a partial set
+registry = ModelRegistry({}, None)
+audit_log = AuditLog(AUDIT_DB_PATH)
+
+def parse_timestamp(value):
+    """Parse epoch seconds or an ISO 8601 string into epoch seconds"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
 
 # Try to load model and related components
 def load_model_files():
-    global model, scaler, imputer
+    global registry
    
     # Check alternative paths if models aren't found
     alt_model_paths = [
@@ -50,81 +74,54 @@ def load_model_files():
         "C:/Users/HP/OneDrive/Desktop/DS Project/backend/models/model.pkl"
     ]
    
-    # Try to load model
     try:
-        if os.path.exists(MODEL_PATH):
-            logger.info(f"Loading model from {MODEL_PATH}")
-            model = joblib.load(MODEL_PATH)
-            logger.info("✅ Model loaded successfully.")
+        # Unchanged models keep their stats and drift window across reloads
+        new_registry = load_registry(REGISTRY_CONFIG_PATH, current_dir, MODEL_DIRECTORY,
+                                     EXPECTED_FEATURES, alt_model_paths, previous=registry)
+        if not new_registry.bundles:
+            logger.warning("❌ Model file not found in any location.")
         else:
-            # Try alternative paths
-            for alt_path in alt_model_paths:
-                logger.info(f"Trying alternative path: {alt_path}")
-                if os.path.exists(alt_path):
-                    model = joblib.load(alt_path)
-                    logger.info(f"✅ Model loaded from alternative path: {alt_path}")
-                    break
-           
-            if model is None:
-                logger.warning("❌ Model file not found in any location.")
+            logger.info(f"✅ Loaded models: {', '.join(new_registry.bundles)} (primary: {new_registry.primary})")
+       
+        # Swap in the new set, then let the old shadow worker drain
+        old_registry, registry = registry, new_registry
+        old_registry.shutdown()
     except Exception as e:
-        logger.error(f"⚠️ Error loading model: {e}")
+        logger.error(f"⚠️ Error loading models: {e}")
         traceback.print_exc()
-   
-    # Try to load scaler
-    try:
-        if os.path.exists(SCALER_PATH):
-            logger.info(f"Loading scaler from {SCALER_PATH}")
-            scaler = joblib.load(SCALER_PATH)
-            logger.info("✅ Scaler loaded successfully.")
-        else:
-            logger.warning("⚠️ Scaler file not found, predictions may be less accurate.")
-    except Exception as e:
-        logger.error(f"⚠️ Error loading scaler: {e}")
-   
-    # Try to load imputer
-    try:
-        if os.path.exists(IMPUTER_PATH):
-            logger.info(f"Loading imputer from {IMPUTER_PATH}")
-            imputer = joblib.load(IMPUTER_PATH)
-            logger.info("✅ Imputer loaded successfully.")
-        else:
-            logger.warning("⚠️ Imputer file not found, predictions may be less accurate.")
-    except Exception as e:
-        logger.error(f"⚠️ Error loading imputer: {e}")
 
 # Load the models when starting
 load_model_files()
 
 @app.route("/predict", methods=["POST"])
 def predict():
+    started = time.perf_counter()
     # Check if model is loaded
-    if model is None:
+    if not registry.bundles:
         # Try loading the model once more
         load_model_files()
        
         # If still not loaded, return error
-        if model is None:
+        if not registry.bundles:
             logger.error("Model not found, can't make prediction")
             return jsonify({"error": "Model not found. Please train the model first."}), 500
    
+    # Hold one registry for the whole request in case of a concurrent reload
+    current = registry
+    requested = request.headers.get("X-Model") or request.args.get("model")
+    bundle = current.route(requested)
+    if bundle is None:
+        return jsonify({"error": f"Unknown model: {requested}",
+                        "available_models": list(current.bundles)}), 404
+   
     try:
         # Get data from request
         data = request.get_json()
         logger.info(f"Received prediction request with {len(data)} features")
        
-        # Create a list of features in the correct order expected by the model
-        expected_features = [
-            'age', 'bmi', 'heart_rate', 'respiratory_rate', 'mean_arterial_pressure',
-            'temperature', 'gcs_eyes', 'gcs_motor', 'gcs_verbal', 'creatinine',
-            'blood_urea_nitrogen', 'sodium', 'albumin', 'wbcs', 'hematocrit',
-            'pao2', 'blood_ph', 'aids', 'cirrhosis', 'diabetes',
-            'hepatic_failure', 'immunosuppression'
-        ]
-       
         # Create input vector, filling missing values with 0
         input_data = []
-        for feature in expected_features:
+        for feature in EXPECTED_FEATURES:
             if feature in data:
                 input_data.append(data[feature])
             else:
@@ -135,28 +132,32 @@ def predict():
         input_array = np.array([input_data], dtype=float)
         logger.info(f"Input shape: {input_array.shape}")
        
-        # Apply preprocessing if available
-        if imputer is not None:
-            logger.info("Applying imputer transformation")
-            input_array = imputer.transform(input_array)
-        if scaler is not None:
-            logger.info("Applying scaler transformation")
-            input_array = scaler.transform(input_array)
-           
-        # Make prediction
-        if hasattr(model, 'predict_proba'):
-            # For classifiers with probability estimation
-            logger.info("Making probability prediction")
-            prediction = model.predict_proba(input_array)[0][1] * 100
-        else:
-            # For other types of models
-            logger.info("Making standard prediction")
-            prediction = float(model.predict(input_array)[0]) * 100
+        # Preprocess and predict with the routed model's own imputer and scaler
+        logger.info(f"Making prediction with model '{bundle.name}'")
+        inference_started = time.perf_counter()
+        prediction = bundle.predict_risk(input_array)
+        bundle.stats.record_latency((time.perf_counter() - inference_started) * 1000)
            
         logger.info(f"Prediction result: {prediction:.2f}%")
-        return jsonify({"mortality_risk": round(prediction, 2)})
+       
+        # Monitoring must never fail a prediction that has already been made
+        try:
+            bundle.monitor.observe(data, prediction)
+        except Exception as e:
+            logger.error(f"⚠️ Drift monitoring error: {e}")
+       
+        # Candidate models score the same input on a background thread
+        current.submit_shadows(input_array, (bundle, prediction))
+       
+        # Queue the audit record; the write happens on a background thread
+        request_id = uuid.uuid4().hex
+        latency_ms = (time.perf_counter() - started) * 1000
+        audit_log.record(request_id, data, f"{bundle.name}@{bundle.version}", prediction, latency_ms)
+        return jsonify({"mortality_risk": round(prediction, 2), "request_id": request_id,
+                        "model": bundle.name})
    
     except Exception as e:
+        bundle.stats.record_error()
         logger.error(f"⚠️ Prediction error: {e}")
         traceback.print_exc()
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 400
@@ -231,13 +232,79 @@ def analyze():
 
 @app.route("/health", methods=["GET"])
 def health_check():
+    current = registry
+    primary = current.get()
     return jsonify({
         "status": "healthy",
-        "model_loaded": model is not None,
-        "scaler_loaded": scaler is not None,
-        "imputer_loaded": imputer is not None,
+        "model_loaded": primary is not None,
+        "scaler_loaded": primary is not None and primary.scaler is not None,
+        "imputer_loaded": primary is not None and primary.imputer is not None,
         "model_path": MODEL_PATH,
-        "model_exists": os.path.exists(MODEL_PATH)
+        "model_exists": os.path.exists(MODEL_PATH),
+        "primary_model": current.primary,
+        "models_loaded": list(current.bundles)
+    })
+
+@app.route("/monitoring", methods=["GET"])
+def monitoring_summary():
+    name = request.args.get("model")
+    bundle = registry.get(name)
+    if bundle is None:
+        error = f"Unknown model: {name}" if name else "No model loaded"
+        return jsonify({"error": error}), 404
+   
+    try:
+        summary = bundle.monitor.summary()
+        summary["model"] = bundle.name
+        return jsonify(summary)
+    except Exception as e:
+        logger.error(f"Error computing monitoring summary: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/monitoring/reset", methods=["POST"])
+def monitoring_reset():
+    current = registry
+    for bundle in current.bundles.values():
+        bundle.monitor.reset()
+    logger.info("Monitoring window reset")
+    return jsonify({"success": True})
+
+@app.route("/audit", methods=["GET"])
+def audit_query():
+    try:
+        start = parse_timestamp(request.args.get("start"))
+        end = parse_timestamp(request.args.get("end"))
+        min_risk = request.args.get("min_risk")
+        min_risk = float(min_risk) if min_risk is not None else None
+        limit = max(1, min(int(request.args.get("limit", 100)), 1000))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
+   
+    try:
+        records = audit_log.query(start=start, end=end, min_risk=min_risk, limit=limit)
+        return jsonify({"count": len(records), "predictions": records})
+    except Exception as e:
+        logger.error(f"Error querying audit log: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/audit/stats", methods=["GET"])
+def audit_stats():
+    return jsonify(audit_log.stats())
+
+@app.route("/models", methods=["GET"])
+def list_models():
+    return jsonify(registry.describe())
+
+@app.route("/models/reload", methods=["POST"])
+def reload_models():
+    load_model_files()
+    current = registry
+    return jsonify({
+        "success": bool(current.bundles),
+        "primary": current.primary,
+        "models": list(current.bundles)
     })
 
 @app.route("/train", methods=["GET"])
@@ -266,7 +333,7 @@ def train_model():
             return jsonify({
                 "success": True,
                 "message": "Model trained successfully",
-                "model_loaded": model is not None
+                "model_loaded": bool(registry.bundles)
             })
         else:
             logger.error(f"Model training failed: {result.stderr}")
@@ -0,0 +1,247 @@
+# backend/audit_log.py
+
+import atexit
+import collections
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    request_id TEXT NOT NULL,
+    model_version TEXT,
+    risk REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    inputs TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_risk ON predictions (risk);
+"""
+
+INSERT_SQL = """
+INSERT INTO predictions (timestamp, request_id, model_version, risk, latency_ms, inputs)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class AuditLog:
+    """
+    Append-only prediction audit log backed by SQLite in WAL mode
+
+    Requests only append to a bounded in-memory buffer; a background thread
+    drains it to disk in batches. When the buffer is full new records are
+    dropped and counted rather than blocking the caller. Batches that fail to
+    write go back to the front of the buffer and are retried on the next flush.
+    """
+
+    def __init__(self, db_path, capacity=10000, batch_size=256, flush_interval=1.0):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file
+            capacity (int): Maximum number of records held in memory
+            batch_size (int): Number of buffered records that triggers a flush
+            flush_interval (float): Maximum seconds between flushes
+        """
+        self.db_path = db_path
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffer = collections.deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._write_errors = 0
+        self._flushes = 0
+        self._last_flush_at = None
+        self._last_flush_seconds = None
+        self._max_depth = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, request_id, inputs, model_version, risk, latency_ms):
+        """
+        Queue one prediction for writing without blocking on disk I/O
+
+        Args:
+            request_id (str): Identifier returned to the client
+            inputs (dict): Raw request payload
+            model_version (str): Version of the model that produced the risk
+            risk (float): Predicted mortality risk in percent
+            latency_ms (float): Time taken to serve the prediction
+
+        Returns:
+            bool: False if the record was dropped because the buffer is full
+        """
+        entry = (time.time(), request_id, model_version, float(risk), float(latency_ms), inputs)
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                self._dropped += 1
+                return False
+            self._buffer.append(entry)
+            self._enqueued += 1
+            depth = len(self._buffer)
+            if depth > self._max_depth:
+                self._max_depth = depth
+        if depth >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _drain(self):
+        with self._lock:
+            batch = list(self._buffer)
+            self._buffer.clear()
+        return batch
+
+    def _requeue(self, batch):
+        # Keep the oldest records that still fit; only those that do not are lost
+        with self._lock:
+            space = max(0, self.capacity - len(self._buffer))
+            self._buffer.extendleft(reversed(batch[:space]))
+            lost = len(batch) - min(space, len(batch))
+            self._dropped += lost
+        return lost
+
+    def _write(self, conn, batch):
+        # Serialise inputs here so the request path never pays for it
+        rows = [(ts, rid, version, risk, latency, json.dumps(inputs, default=str))
+                for ts, rid, version, risk, latency, inputs in batch]
+        started = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, rows)
+            self._written += len(rows)
+        except Exception as e:
+            lost = self._requeue(batch)
+            self._write_errors += 1
+            logger.error(f"⚠️ Audit log write failed, {len(rows) - lost} records requeued, {lost} dropped: {e}")
+        self._flushes += 1
+        self._last_flush_at = time.time()
+        self._last_flush_seconds = time.perf_counter() - started
+
+    def _run(self):
+        # One writer connection for the lifetime of the thread
+        conn = self._connect()
+        try:
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                batch = self._drain()
+                if batch:
+                    self._write(conn, batch)
+                if self._stopping:
+                    break
+        finally:
+            conn.close()
+            # Anything still buffered after the final flush cannot be written any more
+            with self._lock:
+                lost = len(self._buffer)
+                self._buffer.clear()
+                self._dropped += lost
+            if lost:
+                logger.error(f"⚠️ Audit log stopped with {lost} unwritten records")
+
+    def close(self):
+        """Stop the writer thread after flushing any buffered records"""
+        if self._stopping:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout=10)
+
+    def stats(self):
+        """
+        Backpressure and throughput counters
+
+        Returns:
+            dict: Buffer depth, enqueued/written/dropped counts and flush timings
+        """
+        with self._lock:
+            depth = len(self._buffer)
+        return {
+            "db_path": self.db_path,
+            "capacity": self.capacity,
+            "buffer_depth": depth,
+            "max_buffer_depth": self._max_depth,
+            "enqueued": self._enqueued,
+            "written": self._written,
+            "dropped": self._dropped,
+            "write_errors": self._write_errors,
+            "flushes": self._flushes,
+            "last_flush_at": self._last_flush_at,
+            "last_flush_ms": self._last_flush_seconds * 1000 if self._last_flush_seconds is not None else None
+        }
+
+    def query(self, start=None, end=None, min_risk=None, limit=100):
+        """
+        Read recent predictions from disk, newest first
+
+        Args:
+            start (float, optional): Earliest timestamp (epoch seconds)
+            end (float, optional): Latest timestamp (epoch seconds)
+            min_risk (float, optional): Minimum predicted risk in percent
+            limit (int): Maximum number of records to return
+
+        Returns:
+            list: Prediction records as dicts
+        """
+        clauses = []
+        params = []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end)
+        if min_risk is not None:
+            clauses.append("risk >= ?")
+            params.append(min_risk)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # SQLite treats a negative LIMIT as no limit at all
+        params.append(max(1, int(limit)))
+
+        sql = (f"SELECT timestamp, request_id, model_version, risk, latency_ms, inputs "
+               f"FROM predictions {where} ORDER BY timestamp DESC LIMIT ?")
+        # WAL lets this reader run alongside the writer thread
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        return [{
+            "timestamp": ts,
+            "request_id": rid,
+            "model_version": version,
+            "risk": risk,
+            "latency_ms": latency,
+            "inputs": json.loads(inputs)
+        } for ts, rid, version, risk, latency, inputs in rows]
@@ -9,6 +9,7 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.impute import SimpleImputer
 import pickle
 import os
+from monitoring import build_reference_profile, save_reference_profile
 
 def ensure_dir(file_path):
     """
@@ -66,8 +67,11 @@ def preprocess_data(X, y, test_size=0.2, random_state=42):
         random_state (int): Random seed for reproducibility
     
     Returns:
-        tuple: Scaled training and test sets
+        tuple: Scaled training and test sets, fitted preprocessors and drift reference profile
     """
+    # Capture raw feature distributions for drift monitoring
+    reference = build_reference_profile(X, y)
+    
     # Impute missing values with median
     imputer = SimpleImputer(strategy='median')
     X_imputed = imputer.fit_transform(X)
@@ -80,7 +84,7 @@ def preprocess_data(X, y, test_size=0.2, random_state=42):
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    return X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer
+    return X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer, reference
 
 def train_model(X_train, y_train, n_estimators=100, random_state=42):
     """
@@ -120,9 +124,9 @@ def evaluate_model(model, X_test, y_test):
         "classification_report": report
     }
 
-def save_model(model, model_path="./models/model.pkl", scaler=None, scaler_path="./models/scaler.pkl", imputer=None, imputer_path="./models/imputer.pkl"):
+def save_model(model, model_path="./models/model.pkl", scaler=None, scaler_path="./models/scaler.pkl", imputer=None, imputer_path="./models/imputer.pkl", reference=None, reference_path="./models/reference_profile.json"):
     """
-    Save trained model, scaler, and imputer
+    Save trained model, scaler, imputer, and drift reference profile
     
     Args:
         model (sklearn.ensemble.RandomForestClassifier): Trained model
@@ -131,6 +135,8 @@ def save_model(model, model_path="./models/model.pkl", scaler=None, scaler_path=
         scaler_path (str, optional): Path to save scaler
         imputer (sklearn.impute.SimpleImputer, optional): Missing value imputer
         imputer_path (str, optional): Path to save imputer
+        reference (dict, optional): Drift reference profile from preprocess_data
+        reference_path (str, optional): Path to save reference profile
     """
     # Ensure directories exist
     ensure_dir(model_path)
@@ -150,6 +156,10 @@ def save_model(model, model_path="./models/model.pkl", scaler=None, scaler_path=
         ensure_dir(imputer_path)
         with open(imputer_path, "wb") as imputer_file:
             pickle.dump(imputer, imputer_file)
+    
+    # Save reference profile last so it never sits next to a stale model
+    if reference:
+        save_reference_profile(reference, reference_path)
 
 def load_saved_model(model_path="./models/model.pkl", scaler_path="./models/scaler.pkl", imputer_path="./models/imputer.pkl"):
     """
@@ -0,0 +1,262 @@
+# backend/monitoring.py
+
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+# Number of quantile bins captured per feature at training time
+REFERENCE_BINS = 10
+
+# Predicted risk is reported as a percentage, bucketed in 10-point steps
+RISK_BIN_EDGES = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0]
+
+# Floor applied to bin proportions so PSI stays finite for empty bins
+PSI_EPSILON = 1e-4
+
+
+def build_reference_profile(X, y=None, n_bins=REFERENCE_BINS):
+    """
+    Capture per-feature reference distributions from the raw training data
+
+    Args:
+        X (pd.DataFrame): Features before imputation
+        y (pd.Series, optional): Target variable
+        n_bins (int): Number of quantile bins per feature; features with at most
+            this many distinct values get one bin per value instead
+
+    Returns:
+        dict: JSON-serialisable reference profile
+    """
+    features = {}
+    for column in X.columns:
+        values = X[column].to_numpy(dtype=float)
+        observed = values[~np.isnan(values)]
+        missing_rate = 1.0 - len(observed) / len(values) if len(values) else 0.0
+
+        if len(observed) == 0:
+            features[column] = {"edges": [], "proportions": [], "missing_rate": missing_rate}
+            continue
+
+        distinct = np.unique(observed)
+        if len(distinct) <= n_bins:
+            # Categorical/binary features: one bin per value, split at the midpoints
+            edges = ((distinct[:-1] + distinct[1:]) / 2).tolist()
+        else:
+            # Interior quantile edges; duplicates collapse for skewed features
+            quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+            edges = sorted(set(np.quantile(observed, quantiles).tolist()))
+
+        # Bin i holds values in [edges[i-1], edges[i]), matching bisect_right
+        counts = np.bincount(np.searchsorted(edges, observed, side="right"),
+                             minlength=len(edges) + 1)
+        features[column] = {
+            "edges": edges,
+            "proportions": (counts / len(observed)).tolist(),
+            "missing_rate": missing_rate
+        }
+
+    profile = {
+        "created_at": time.time(),
+        "n_samples": int(len(X)),
+        "feature_order": list(X.columns),
+        "features": features
+    }
+    if y is not None and len(y):
+        profile["mortality_rate"] = float(np.mean(y))
+    return profile
+
+
+def save_reference_profile(profile, profile_path):
+    """
+    Save a reference profile as JSON
+
+    Args:
+        profile (dict): Reference profile from build_reference_profile
+        profile_path (str): Path to save the profile
+    """
+    directory = os.path.dirname(profile_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(profile_path, "w") as profile_file:
+        json.dump(profile, profile_file)
+
+
+def load_reference_profile(profile_path):
+    """
+    Load a reference profile saved at training time
+
+    Args:
+        profile_path (str): Path to the saved profile
+
+    Returns:
+        dict or None: Reference profile, or None if the file does not exist
+    """
+    if not os.path.exists(profile_path):
+        return None
+    with open(profile_path, "r") as profile_file:
+        return json.load(profile_file)
+
+
+def population_stability_index(expected, actual):
+    """
+    Population Stability Index between two binned distributions
+
+    Args:
+        expected (list): Reference bin proportions
+        actual (list): Live bin proportions
+
+    Returns:
+        float: PSI value (< 0.1 stable, 0.1-0.25 moderate, > 0.25 major shift)
+    """
+    psi = 0.0
+    for e, a in zip(expected, actual):
+        e = max(e, PSI_EPSILON)
+        a = max(a, PSI_EPSILON)
+        psi += (a - e) * math.log(a / e)
+    return psi
+
+
+def ks_statistic(expected, actual):
+    """
+    Kolmogorov-Smirnov statistic evaluated at the shared bin edges
+
+    Args:
+        expected (list): Reference bin proportions
+        actual (list): Live bin proportions
+
+    Returns:
+        float: Maximum absolute difference between the two binned CDFs
+    """
+    cdf_expected = 0.0
+    cdf_actual = 0.0
+    statistic = 0.0
+    for e, a in zip(expected, actual):
+        cdf_expected += e
+        cdf_actual += a
+        statistic = max(statistic, abs(cdf_expected - cdf_actual))
+    return statistic
+
+
+class DriftMonitor:
+    """
+    Streaming drift and risk monitor for incoming prediction requests
+
+    Keeps fixed-size counters per feature so memory does not grow with
+    traffic; drift statistics are only computed when a summary is requested.
+    """
+
+    def __init__(self, feature_names, reference=None):
+        """
+        Args:
+            feature_names (list): Features expected in each request
+            reference (dict, optional): Profile from build_reference_profile
+        """
+        self.feature_names = list(feature_names)
+        self.reference = reference
+        self._lock = threading.Lock()
+
+        ref_features = reference["features"] if reference else {}
+        self._edges = [ref_features.get(name, {}).get("edges", []) for name in self.feature_names]
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._started_at = time.time()
+        self._n_requests = 0
+        self._missing = [0] * len(self.feature_names)
+        self._counts = [[0] * (len(edges) + 1) for edges in self._edges]
+        self._risk_counts = [0] * (len(RISK_BIN_EDGES) + 1)
+        self._risk_sum = 0.0
+
+    def reset(self):
+        """Discard all live counters and start a new monitoring window"""
+        with self._lock:
+            self._reset_counters()
+
+    def observe(self, features, risk):
+        """
+        Record one request and its predicted risk
+
+        Args:
+            features (dict): Raw request payload, before default filling
+            risk (float): Predicted mortality risk in percent
+        """
+        # Resolve bins outside the lock; only the increments are serialised
+        bins = []
+        for i, name in enumerate(self.feature_names):
+            value = features.get(name)
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                value = math.nan
+            if math.isnan(value):
+                bins.append(-1)
+            else:
+                bins.append(bisect.bisect_right(self._edges[i], value))
+        risk_bin = bisect.bisect_right(RISK_BIN_EDGES, risk)
+
+        with self._lock:
+            self._n_requests += 1
+            for i, b in enumerate(bins):
+                if b < 0:
+                    self._missing[i] += 1
+                else:
+                    self._counts[i][b] += 1
+            self._risk_counts[risk_bin] += 1
+            self._risk_sum += risk
+
+    def summary(self):
+        """
+        Compute drift statistics for the current monitoring window
+
+        Returns:
+            dict: Per-feature missing rates and PSI/KS drift, plus risk distribution
+        """
+        with self._lock:
+            n_requests = self._n_requests
+            started_at = self._started_at
+            missing = list(self._missing)
+            counts = [list(c) for c in self._counts]
+            risk_counts = list(self._risk_counts)
+            risk_sum = self._risk_sum
+
+        ref_features = self.reference["features"] if self.reference else {}
+        features = {}
+        for i, name in enumerate(self.feature_names):
+            observed = sum(counts[i])
+            entry = {
+                "missing_rate": missing[i] / n_requests if n_requests else None,
+                "observed": observed
+            }
+            ref = ref_features.get(name)
+            if ref is not None:
+                entry["reference_missing_rate"] = ref["missing_rate"]
+            if ref is not None and ref["proportions"] and observed:
+                live = [c / observed for c in counts[i]]
+                entry["psi"] = round(population_stability_index(ref["proportions"], live), 6)
+                entry["ks"] = round(ks_statistic(ref["proportions"], live), 6)
+            features[name] = entry
+
+        risk_labels = []
+        lower = 0.0
+        for upper in RISK_BIN_EDGES + [100.0]:
+            risk_labels.append(f"{lower:g}-{upper:g}")
+            lower = upper
+
+        result = {
+            "window_started_at": started_at,
+            "n_requests": n_requests,
+            "reference_loaded": self.reference is not None,
+            "features": features,
+            "risk": {
+                "histogram": dict(zip(risk_labels, risk_counts)),
+                "mean": risk_sum / n_requests if n_requests else None
+            }
+        }
+        if self.reference and "mortality_rate" in self.reference:
+            result["risk"]["reference_mortality_rate"] = self.reference["mortality_rate"] * 100
+        return result
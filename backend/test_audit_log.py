@@ -0,0 +1,97 @@
+# backend/test_audit_log.py
+
+import time
+
+import audit_log as audit_log_module
+from audit_log import AuditLog
+
+
+def make_log(tmp_path, **kwargs):
+    return AuditLog(str(tmp_path / "audit.db"), **kwargs)
+
+
+def test_close_flushes_buffered_records(tmp_path):
+    audit_log = make_log(tmp_path, flush_interval=60)
+    for i in range(5):
+        assert audit_log.record(f"r{i}", {"age": i}, "default@abc", i * 20.0, 1.5)
+    audit_log.close()
+
+    stats = audit_log.stats()
+    assert stats["enqueued"] == 5
+    assert stats["written"] == 5
+    assert stats["buffer_depth"] == 0
+    assert stats["write_errors"] == 0
+
+    records = audit_log.query()
+    assert [r["request_id"] for r in records] == ["r4", "r3", "r2", "r1", "r0"]
+    assert records[0]["inputs"] == {"age": 4}
+    assert records[0]["model_version"] == "default@abc"
+
+
+def test_full_buffer_drops_new_records(tmp_path):
+    audit_log = make_log(tmp_path, capacity=3, batch_size=100, flush_interval=60)
+    accepted = [audit_log.record(f"r{i}", {}, "v", 10.0, 1.0) for i in range(5)]
+    assert accepted == [True, True, True, False, False]
+
+    stats = audit_log.stats()
+    assert stats["buffer_depth"] == 3
+    assert stats["dropped"] == 2
+    audit_log.close()
+    assert audit_log.stats()["written"] == 3
+
+
+def test_query_filters_by_risk_and_time(tmp_path):
+    audit_log = make_log(tmp_path, flush_interval=60)
+    audit_log.record("low", {}, "v", 10.0, 1.0)
+    time.sleep(0.01)
+    cutoff = time.time()
+    audit_log.record("high", {}, "v", 80.0, 1.0)
+    audit_log.close()
+
+    assert [r["request_id"] for r in audit_log.query(min_risk=50)] == ["high"]
+    assert [r["request_id"] for r in audit_log.query(end=cutoff)] == ["low"]
+    assert [r["request_id"] for r in audit_log.query(start=cutoff)] == ["high"]
+
+
+def test_query_negative_limit_is_not_unbounded(tmp_path):
+    audit_log = make_log(tmp_path, flush_interval=60)
+    for i in range(5):
+        audit_log.record(f"r{i}", {}, "v", 10.0, 1.0)
+    audit_log.close()
+
+    assert len(audit_log.query(limit=-5)) == 1
+    assert len(audit_log.query(limit=2)) == 2
+
+
+def test_failed_write_is_retried(tmp_path, monkeypatch):
+    audit_log = make_log(tmp_path, flush_interval=60)
+    for i in range(3):
+        audit_log.record(f"r{i}", {}, "v", 10.0, 1.0)
+
+    # Fail the first flush, as a locked or full database would
+    monkeypatch.setattr(audit_log_module, "INSERT_SQL", "INSERT INTO missing_table VALUES (?, ?, ?, ?, ?, ?)")
+    audit_log._wakeup.set()
+    deadline = time.time() + 5
+    while audit_log.stats()["write_errors"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert audit_log.stats()["write_errors"] == 1
+    assert audit_log.stats()["buffer_depth"] == 3
+
+    monkeypatch.undo()
+    audit_log.close()
+
+    stats = audit_log.stats()
+    assert stats["written"] == 3
+    assert stats["dropped"] == 0
+    assert [r["request_id"] for r in audit_log.query()] == ["r2", "r1", "r0"]
+
+
+def test_requeue_keeps_oldest_records_within_capacity(tmp_path):
+    audit_log = make_log(tmp_path, capacity=3, batch_size=100, flush_interval=60)
+    audit_log.record("new", {}, "v", 10.0, 1.0)
+
+    failed_batch = [(0.0, f"old{i}", "v", 10.0, 1.0, {}) for i in range(3)]
+    assert audit_log._requeue(failed_batch) == 1
+    assert [entry[1] for entry in audit_log._buffer] == ["old0", "old1", "new"]
+    assert audit_log.stats()["dropped"] == 1
+    audit_log.close()
@@ -0,0 +1,169 @@
+# backend/test_model_registry.py
+
+import json
+import threading
+import time
+
+import joblib
+
+from model_registry import ModelBundle, ModelRegistry, load_registry
+from monitoring import DriftMonitor
+
+
+class FixedRiskModel:
+    """Stand-in classifier that always returns the same probability"""
+
+    def __init__(self, probability):
+        self.probability = probability
+
+    def predict_proba(self, input_array):
+        return [[1 - self.probability, self.probability]]
+
+
+class BlockingModel(FixedRiskModel):
+    """Classifier whose predictions wait until the test releases them"""
+
+    def __init__(self, probability):
+        super().__init__(probability)
+        self.release = threading.Event()
+
+    def predict_proba(self, input_array):
+        self.release.wait(5)
+        return super().predict_proba(input_array)
+
+
+class IdentityScaler:
+    """Stand-in preprocessing step that leaves its input unchanged"""
+
+    def transform(self, input_array):
+        return input_array
+
+
+def make_bundle(name, probability=0.3, weight=0.0, model=None):
+    return ModelBundle(name, "models", model or FixedRiskModel(probability), None, None,
+                       "v1", DriftMonitor(["age"]), weight)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_route_honours_explicit_model():
+    registry = ModelRegistry({"current": make_bundle("current", weight=1.0),
+                              "candidate": make_bundle("candidate")}, "current")
+    assert registry.route("candidate").name == "candidate"
+    assert registry.route("missing") is None
+    assert registry.route().name == "current"
+
+
+def test_route_skips_primary_without_weight():
+    registry = ModelRegistry({"current": make_bundle("current", weight=0.0),
+                              "candidate": make_bundle("candidate", weight=1.0)}, "current")
+    assert {registry.route().name for _ in range(50)} == {"candidate"}
+
+
+def test_route_splits_traffic_by_weight():
+    registry = ModelRegistry({"current": make_bundle("current", weight=0.8),
+                              "candidate": make_bundle("candidate", weight=0.2)}, "current")
+    names = [registry.route().name for _ in range(5000)]
+    assert 0.15 < names.count("candidate") / len(names) < 0.25
+
+
+def test_shadow_records_agreement():
+    current = make_bundle("current", 0.3, weight=1.0)
+    candidate = make_bundle("candidate", 0.6)
+    registry = ModelRegistry({"current": current, "candidate": candidate}, "current", shadow=["candidate"])
+
+    registry.submit_shadows([[1.0]], (current, current.predict_risk([[1.0]])))
+    assert wait_for(lambda: candidate.stats.summary()["shadowed"] == 1)
+    registry.shutdown()
+
+    agreement = candidate.stats.summary()["agreement"]
+    assert agreement["compared"] == 1
+    assert agreement["rate"] == 0.0
+    assert abs(agreement["mean_abs_risk_diff"] - 30.0) < 1e-9
+
+
+def test_shadow_skipped_while_worker_busy():
+    current = make_bundle("current", weight=1.0)
+    candidate = make_bundle("candidate", model=BlockingModel(0.5))
+    registry = ModelRegistry({"current": current, "candidate": candidate}, "current", shadow=["candidate"])
+
+    registry.submit_shadows([[1.0]], (current, 30.0))
+    registry.submit_shadows([[1.0]], (current, 30.0))
+    assert registry.describe()["shadow_skipped"] == 1
+
+    candidate.model.release.set()
+    assert wait_for(lambda: candidate.stats.summary()["shadowed"] == 1)
+    registry.shutdown()
+
+
+def test_shadow_after_shutdown_is_skipped_not_raised():
+    current = make_bundle("current", weight=1.0)
+    candidate = make_bundle("candidate")
+    registry = ModelRegistry({"current": current, "candidate": candidate}, "current", shadow=["candidate"])
+    registry.shutdown()
+
+    # A request that captured the registry before a reload must still succeed
+    registry.submit_shadows([[1.0]], (current, 30.0))
+    registry.submit_shadows([[1.0]], (current, 30.0))
+    assert registry.describe()["shadow_skipped"] == 2
+    assert current.stats.summary()["errors"] == 0
+
+
+def write_registry(tmp_path):
+    for name, probability in [("current", 0.3), ("candidate", 0.6)]:
+        (tmp_path / name).mkdir()
+        joblib.dump(FixedRiskModel(probability), tmp_path / name / "model.pkl")
+    config_path = tmp_path / "registry.json"
+    config_path.write_text(json.dumps({
+        "primary": "current",
+        "models": {"current": {"path": "current", "weight": 1.0}, "candidate": {"path": "candidate"}}
+    }))
+
+    def load(previous=None):
+        return load_registry(str(config_path), str(tmp_path), str(tmp_path), ["age"], previous=previous)
+    return load
+
+
+def test_reload_keeps_stats_for_unchanged_models(tmp_path):
+    load = write_registry(tmp_path)
+    first = load()
+    first.get("current").stats.record_latency(1.0)
+    first.get("candidate").stats.record_latency(1.0)
+
+    # Retrain only the candidate
+    joblib.dump(FixedRiskModel(0.7), tmp_path / "candidate" / "model.pkl")
+    second = load(previous=first)
+
+    assert second.get("current").stats is first.get("current").stats
+    assert second.get("current").monitor is first.get("current").monitor
+    assert second.get("candidate").version != first.get("candidate").version
+    assert second.get("candidate").stats.summary()["served"] == 0
+
+
+def test_reload_picks_up_new_profile_and_preprocessing(tmp_path):
+    load = write_registry(tmp_path)
+    first = load()
+    assert first.get("current").monitor.reference is None
+
+    # Same model.pkl, but a reference profile appears and the candidate gets a scaler
+    (tmp_path / "current" / "reference_profile.json").write_text(json.dumps({
+        "features": {"age": {"edges": [50.0], "proportions": [0.5, 0.5], "missing_rate": 0.0}}
+    }))
+    joblib.dump(IdentityScaler(), tmp_path / "candidate" / "scaler.pkl")
+    second = load(previous=first)
+
+    current = second.get("current")
+    assert current.version != first.get("current").version
+    assert current.monitor is not first.get("current").monitor
+    assert current.monitor.reference is not None
+    assert current.describe()["reference_loaded"]
+
+    candidate = second.get("candidate")
+    assert candidate.version != first.get("candidate").version
+    assert candidate.stats is not first.get("candidate").stats
+    assert candidate.scaler is not None
@@ -0,0 +1,85 @@
+# backend/test_monitoring.py
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from monitoring import (DriftMonitor, build_reference_profile, ks_statistic,
+                        population_stability_index)
+
+
+def test_psi_and_ks_identical_distributions():
+    proportions = [0.25, 0.25, 0.25, 0.25]
+    assert population_stability_index(proportions, proportions) == 0.0
+    assert ks_statistic(proportions, proportions) == 0.0
+
+
+def test_psi_and_ks_known_shift():
+    expected = [0.5, 0.5]
+    actual = [0.25, 0.75]
+    psi = (0.25 - 0.5) * math.log(0.25 / 0.5) + (0.75 - 0.5) * math.log(0.75 / 0.5)
+    assert math.isclose(population_stability_index(expected, actual), psi)
+    assert math.isclose(ks_statistic(expected, actual), 0.25)
+
+
+def test_psi_stays_finite_for_empty_bins():
+    assert math.isfinite(population_stability_index([0.5, 0.5], [1.0, 0.0]))
+
+
+def test_reference_profile_captures_bins_and_missing_rate():
+    X = pd.DataFrame({"age": [float(i) for i in range(1, 10)] + [np.nan]})
+    y = pd.Series([0, 1] * 5)
+    profile = build_reference_profile(X, y, n_bins=4)
+
+    feature = profile["features"]["age"]
+    assert math.isclose(feature["missing_rate"], 0.1)
+    assert len(feature["proportions"]) == len(feature["edges"]) + 1
+    assert math.isclose(sum(feature["proportions"]), 1.0)
+    assert profile["mortality_rate"] == 0.5
+
+
+def test_reference_profile_bins_binary_features_by_value():
+    X = pd.DataFrame({"cirrhosis": [1.0] + [0.0] * 99})
+    feature = build_reference_profile(X)["features"]["cirrhosis"]
+    assert feature["edges"] == [0.5]
+    assert feature["proportions"] == [0.99, 0.01]
+
+
+def test_binary_prevalence_shift_is_detected():
+    X = pd.DataFrame({"cirrhosis": [1.0] + [0.0] * 99})
+    monitor = DriftMonitor(["cirrhosis"], build_reference_profile(X))
+    for _ in range(50):
+        monitor.observe({"cirrhosis": 1}, 40.0)
+
+    drift = monitor.summary()["features"]["cirrhosis"]
+    assert drift["psi"] > 0.25
+    assert math.isclose(drift["ks"], 0.99)
+
+
+def test_monitor_counts_missing_values_and_risk():
+    reference = {"features": {"a": {"edges": [1.0, 2.0], "proportions": [0.5, 0.25, 0.25],
+                                    "missing_rate": 0.0}}}
+    monitor = DriftMonitor(["a", "b"], reference)
+    monitor.observe({"a": 0.5, "b": 1}, 15.0)
+    monitor.observe({"a": None}, 95.0)
+    monitor.observe({"a": "not a number", "b": 2}, 55.0)
+
+    summary = monitor.summary()
+    assert summary["n_requests"] == 3
+    assert math.isclose(summary["features"]["a"]["missing_rate"], 2 / 3)
+    assert math.isclose(summary["features"]["b"]["missing_rate"], 1 / 3)
+    # A single observation in the first bin is a full shift of 0.5 in the CDF
+    assert math.isclose(summary["features"]["a"]["ks"], 0.5)
+    assert summary["risk"]["histogram"]["10-20"] == 1
+    assert summary["risk"]["histogram"]["90-100"] == 1
+    assert math.isclose(summary["risk"]["mean"], 55.0)
+
+
+def test_monitor_reset_clears_window():
+    monitor = DriftMonitor(["a"])
+    monitor.observe({"a": 1}, 10.0)
+    monitor.reset()
+    summary = monitor.summary()
+    assert summary["n_requests"] == 0
+    assert summary["risk"]["mean"] is None
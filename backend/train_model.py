@@ -10,8 +10,9 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.impute import SimpleImputer
 import pickle
 import traceback
+from monitoring import build_reference_profile, save_reference_profile
 
-# Define functions directly in this file (no external imports needed)
+# Define functions directly in this file (only drift profiling comes from monitoring.py)
 def ensure_dir(file_path):
     """Ensure directory exists for a given file path"""
     directory = os.path.dirname(file_path)
@@ -60,6 +61,10 @@ def preprocess_data(X, y, test_size=0.2, random_state=42):
     """Preprocess data by handling missing values, splitting, and scaling"""
     print("Preprocessing data...")
    
+    # Capture raw feature distributions for drift monitoring
+    print("Building reference profile...")
+    reference = build_reference_profile(X, y)
+   
     # Impute missing values with median
     print("Imputing missing values...")
     imputer = SimpleImputer(strategy='median')
@@ -76,7 +81,7 @@ def preprocess_data(X, y, test_size=0.2, random_state=42):
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
    
-    return X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer
+    return X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer, reference
 
 def train_model(X_train, y_train, n_estimators=100, random_state=42):
     """Train RandomForest classifier"""
@@ -98,8 +103,9 @@ def evaluate_model(model, X_test, y_test):
         "classification_report": report
     }
 
-def save_model(model, model_path, scaler=None, scaler_path=None, imputer=None, imputer_path=None):
-    """Save trained model, scaler, and imputer"""
+def save_model(model, model_path, scaler=None, scaler_path=None, imputer=None, imputer_path=None,
+               reference=None, reference_path=None):
+    """Save trained model, scaler, imputer, and drift reference profile"""
     try:
         # Ensure directories exist
         ensure_dir(model_path)
@@ -125,6 +131,12 @@ def save_model(model, model_path, scaler=None, scaler_path=None, imputer=None, i
             with open(imputer_path, "wb") as imputer_file:
                 pickle.dump(imputer, imputer_file)
                 print("Imputer saved successfully!")
+       
+        # Save reference profile last so it never sits next to a stale model
+        if reference and reference_path:
+            print(f"Saving reference profile to {reference_path}...")
+            save_reference_profile(reference, reference_path)
+            print("Reference profile saved successfully!")
                
         return True
     except Exception as e:
@@ -151,6 +163,7 @@ def main():
     model_path = os.path.join(models_dir, "model.pkl")
     scaler_path = os.path.join(models_dir, "scaler.pkl")
     imputer_path = os.path.join(models_dir, "imputer.pkl")
+    reference_path = os.path.join(models_dir, "reference_profile.json")
    
     print(f"Looking for data file at: {data_path}")
    
@@ -188,7 +201,7 @@ def main():
    
     try:
         # Preprocess data
-        X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer = preprocess_data(X, y)
+        X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer, reference = preprocess_data(X, y)
        
         # Train model
         model = train_model(X_train_scaled, y_train)
@@ -208,7 +221,8 @@ def main():
         success = save_model(
             model, model_path,
             scaler, scaler_path,
-            imputer, imputer_path
+            imputer, imputer_path,
+            reference, reference_path
         )
        
         if success:
@@ -216,6 +230,7 @@ def main():
             print(f"Model saved to: {model_path}")
             print(f"Scaler saved to: {scaler_path}")
             print(f"Imputer saved to: {imputer_path}")
+            print(f"Reference profile saved to: {reference_path}")
         else:
             print("\nERROR: Failed to save one or more model artifacts.")
    